@@ -6,15 +6,24 @@ from dateutil.relativedelta import relativedelta
 from lista_feriados import feriados
 import math
 from babel.numbers import format_currency
+from metricas import BCB_REQUISICOES, BCB_FALLBACKS, BCB_LATENCIA, SIMULACAO_LATENCIA
+
+# Feriados convertidos uma única vez por processo (usados em todas as instâncias)
+FERIADOS = frozenset(to_datetime(f, dayfirst=True).date() for f in feriados)
+
+# Valores padrão usados quando a API do Banco Central não responde
+TLP_PADRAO = 6.43
+IPCA_PADRAO = 0.44
 
 
 class SimuladorBNDES:
     def __init__(self, valor_liberado: float, carencia: int,
                  periodic_juros: int, prazo_amortizacao: int,
-                 periodic_amortizacao: int, juros_prefixados_aa: float,
-                 ipca_mensal: float = 0.0, spread_bndes_aa: float = 0.95, spread_banco_aa: float = 0.0):
+                 periodic_amortizacao: int, juros_prefixados_aa: float = None,
+                 ipca_mensal: float = None, spread_bndes_aa: float = 0.95, spread_banco_aa: float = 0.0,
+                 data_contratacao: datetime = None):
         # Inicializa os parâmetros principais
-        self.data_contratacao = datetime.today()
+        self.data_contratacao = data_contratacao if data_contratacao is not None else datetime.today()
         self.valor_liberado = valor_liberado
         self.saldo_devedor = valor_liberado
         self.carencia = carencia
@@ -25,18 +34,19 @@ class SimuladorBNDES:
         self.spread_bndes_aa = spread_bndes_aa
 
 
-        # Busca valores da TLP e IPCA automaticamente, se não fornecidos
-        self.ipca_mensal = ipca_mensal if ipca_mensal != 0.0 else self.obter_ipca()
-        self.juros_prefixados_aa = juros_prefixados_aa if juros_prefixados_aa != 0.0 else self.obter_tlp()
+        # Busca valores da TLP e IPCA automaticamente, se não fornecidos (None).
+        # Valores informados são usados como estão, inclusive 0.0.
+        self.ipca_mensal = ipca_mensal if ipca_mensal is not None else self.obter_ipca()
+        self.juros_prefixados_aa = juros_prefixados_aa if juros_prefixados_aa is not None else self.obter_tlp()
         self.spread_banco_aa = spread_banco_aa if spread_banco_aa != 0.0 else 5.75  # Default
 
         self.taxa_total_anual = self.calcular_taxa_total_anual()
 
         # Calcula a quantidade de prestações e converte taxas anuais para mensais
-        self.feriados = [to_datetime(f, dayfirst=True).date() for f in feriados]
+        self.feriados = FERIADOS
         self.quantidade_prestacoes = math.ceil(prazo_amortizacao / periodic_amortizacao)
         self.quantidade_prestacoes_restantes = math.ceil(prazo_amortizacao / periodic_amortizacao)
-        self.juros_prefixados_am = (1 + juros_prefixados_aa / 100) ** (1 / 12) - 1
+        self.juros_prefixados_am = (1 + self.juros_prefixados_aa / 100) ** (1 / 12) - 1
         self.spread_bndes_am = (1 + self.spread_bndes_aa / 100) ** (1 / 12) - 1
         self.spread_banco_am = (1 + self.spread_banco_aa / 100) ** (1 / 12) - 1
         self.taxa_total_mensal = (self.juros_prefixados_am +
@@ -44,6 +54,9 @@ class SimuladorBNDES:
                                   self.spread_banco_am +
                                   self.ipca_mensal / 100)
 
+        # Fluxo numérico das parcelas pagas: (data de vencimento, valor da parcela)
+        self.fluxo_pagamentos = []
+
     def calcular_taxa_total_anual(self):
         # mensal para anual
         ipca_anual = (1 + (self.ipca_mensal / 100)) ** 12 - 1
@@ -58,43 +71,64 @@ class SimuladorBNDES:
 
 
     @staticmethod
-    def obter_tlp():
+    def obter_tlp(usar_padrao=True):
         """
         Obtém o valor mais recente da TLP via API do Banco Central.
+
+        Parâmetros:
+        - usar_padrao (bool): Se True, retorna TLP_PADRAO em caso de falha;
+          se False, lança RuntimeError.
         """
         try:
             url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.27572/dados/ultimos/1?formato=json"
-            response = requests.get(url)
+            with BCB_LATENCIA.medir(serie="tlp"):
+                response = requests.get(url)
             if response.status_code == 200:
                 dados = json.loads(response.text)
                 valor_tlp = float(dados[0]['valor'])
+                BCB_REQUISICOES.inc(serie="tlp", resultado="sucesso")
                 return valor_tlp
             else:
                 print("Erro ao obter a TLP. Verifique a conexão ou o endereço da API.")
-                return 6.43  # Valor padrão em caso de falha
         except Exception as e:
             print(f"Erro ao buscar TLP: {e}")
-            return 6.43  # Valor padrão em caso de falha
+
+        BCB_REQUISICOES.inc(serie="tlp", resultado="falha")
+        if not usar_padrao:
+            raise RuntimeError("Não foi possível obter a TLP do Banco Central.")
+        BCB_FALLBACKS.inc(serie="tlp")
+        return TLP_PADRAO  # Valor padrão em caso de falha
 
     @staticmethod
-    def obter_ipca():
+    def obter_ipca(usar_padrao=True):
         """
         Obtém o valor mais recente do IPCA via API do Banco Central.
+
+        Parâmetros:
+        - usar_padrao (bool): Se True, retorna IPCA_PADRAO em caso de falha;
+          se False, lança RuntimeError.
         """
         try:
             url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.433/dados/ultimos/1?formato=json"
-            response = requests.get(url)
+            with BCB_LATENCIA.medir(serie="ipca"):
+                response = requests.get(url)
             if response.status_code == 200:
                 dados = json.loads(response.text)
                 valor_ipca = float(dados[0]['valor'])
+                BCB_REQUISICOES.inc(serie="ipca", resultado="sucesso")
                 return valor_ipca
             else:
                 print("Erro ao obter o IPCA. Verifique a conexão ou o endereço da API.")
-                return 0.44  # Valor padrão em caso de falha
         except Exception as e:
             print(f"Erro ao buscar IPCA: {e}")
-            return 0.44  # Valor padrão em caso de falha
 
+        BCB_REQUISICOES.inc(serie="ipca", resultado="falha")
+        if not usar_padrao:
+            raise RuntimeError("Não foi possível obter o IPCA do Banco Central.")
+        BCB_FALLBACKS.inc(serie="ipca")
+        return IPCA_PADRAO  # Valor padrão em caso de falha
+
+    @SIMULACAO_LATENCIA.medir()
     def exibir_dados_pagamento(self):
         """
         Exibe as configurações da simulação e os dados de pagamento em formato tabular.
@@ -212,6 +246,9 @@ class SimuladorBNDES:
             # Calcula valor total da parcela
             valor_parcela = round((amortizacao_principal or 0) + juros_bndes + juros_banco, 2)
 
+            # Registra o fluxo numérico para o resumo e o CET
+            self.fluxo_pagamentos.append((data_vencimento, valor_parcela))
+
             # Atualiza saldo devedor
             if amortizacao_principal:
                 self.atualizar_saldo_devedor(amortizacao_principal)
@@ -470,3 +507,65 @@ class SimuladorBNDES:
         juros_banco = round(self.saldo_devedor * (fator_banco - 1), 2)
         return juros_banco
 
+    def calcular_cet(self):
+        """
+        Calcula o Custo Efetivo Total (CET) anual a partir do fluxo de pagamentos,
+        conforme a Resolução CMN 3.517: a taxa que iguala o valor liberado ao valor
+        presente das parcelas, descontadas por (1 + CET) ** (dias / 365).
+
+        Deve ser chamado após `exibir_dados_pagamento`.
+
+        Retorna:
+        - float: CET anual em percentual, arredondado para 2 casas decimais.
+
+        Lança:
+        - ValueError: Se o CET estiver fora do intervalo de busca (-99% a 1000% a.a.).
+        """
+        if not self.fluxo_pagamentos:
+            return 0.0
+
+        data_inicial = to_datetime(self.data_contratacao).date()
+        fluxo = [((to_datetime(data).date() - data_inicial).days / 365, valor)
+                 for data, valor in self.fluxo_pagamentos]
+
+        def valor_presente(taxa):
+            return sum(valor / (1 + taxa) ** anos for anos, valor in fluxo) - self.valor_liberado
+
+        # Busca por bisseção: o valor presente decresce com a taxa
+        taxa_min, taxa_max = -0.99, 10.0
+        if valor_presente(taxa_min) < 0 or valor_presente(taxa_max) > 0:
+            raise ValueError("CET fora do intervalo de busca (-99% a 1000% a.a.).")
+
+        for _ in range(200):
+            taxa = (taxa_min + taxa_max) / 2
+            if valor_presente(taxa) > 0:
+                taxa_min = taxa
+            else:
+                taxa_max = taxa
+            if taxa_max - taxa_min < 1e-10:
+                break
+
+        return round(taxa * 100, 2)
+
+    def resumo_pagamentos(self):
+        """
+        Resume o fluxo de pagamentos da simulação.
+
+        Deve ser chamado após `exibir_dados_pagamento`.
+
+        Retorna:
+        - dict: Total pago, total de juros, maior parcela e CET anual (%).
+          O CET é None quando fica fora do intervalo de busca de `calcular_cet`.
+        """
+        valores = [valor for _, valor in self.fluxo_pagamentos]
+        try:
+            cet_aa = self.calcular_cet()
+        except ValueError:
+            cet_aa = None
+
+        return {
+            "total_pago": round(sum(valores), 2),
+            "total_juros": round(sum(valores) - self.valor_liberado, 2),
+            "maior_parcela": max(valores, default=0.0),
+            "cet_aa": cet_aa,
+        }
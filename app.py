@@ -1,7 +1,11 @@
+import os
+from datetime import date, datetime
 from fpdf import FPDF
 import streamlit as st
 import pandas as pd
-from Simulador import SimuladorBNDES
+from babel.numbers import format_currency
+from Simulador import SimuladorBNDES, TLP_PADRAO, IPCA_PADRAO
+from metricas import BCB_FALLBACKS, CACHE_CONSULTAS, CACHE_FALHAS, PDF_LATENCIA, iniciar_servidor
 
 # Classe para geração de PDF com tabelas e quebra de página
 class PDF(FPDF):
@@ -36,20 +40,151 @@ class PDF(FPDF):
             fill = not fill  # Alterna a cor de fundo para as linhas
 
 
+# Regras de prazo máximo e carência
+regras = {
+    "BK Aquisição e Comercialização (FINAME)": {"prazo_max": 120, "carencia_max": 24, "taxa_bndes_fixo": 0.95},
+    "BNDES Automático - Projeto de Investimento": {"prazo_max": 240, "carencia_max": 36, "taxa_bndes_fixo": 0.95},
+    "BNDES Finame - Baixo Carbono": {"prazo_max": 120, "carencia_max": 24, "taxa_bndes_fixo": 0.75},
+}
+
+
+@st.cache_resource
+def iniciar_metricas():
+    """
+    Expõe as métricas operacionais (/metrics e /metrics.json) uma única vez por processo.
+    A porta vem de SIMULADOR_METRICAS_PORTA (padrão 9108; 0 desativa) e o endereço de
+    SIMULADOR_METRICAS_ENDERECO (padrão 127.0.0.1, apenas conexões locais).
+    """
+    porta = int(os.environ.get("SIMULADOR_METRICAS_PORTA", 9108))
+    endereco = os.environ.get("SIMULADOR_METRICAS_ENDERECO", "127.0.0.1")
+    if not porta:
+        return None
+    try:
+        return iniciar_servidor(porta, endereco)
+    except OSError as e:
+        print(f"Erro ao iniciar o servidor de métricas na porta {porta}: {e}")
+        return None
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _obter_taxa(serie):
+    """
+    Busca a taxa sem valor padrão: falhas lançam RuntimeError, que não entra no cache.
+    """
+    CACHE_FALHAS.inc(cache="taxas")
+    if serie == "tlp":
+        return SimuladorBNDES.obter_tlp(usar_padrao=False)
+    return SimuladorBNDES.obter_ipca(usar_padrao=False)
+
+
+def obter_taxas():
+    """
+    Busca TLP e IPCA uma única vez por hora, compartilhadas por todas as simulações.
+    Em caso de falha usa o valor padrão, sem guardá-lo no cache, para que a próxima
+    consulta tente a API novamente.
+    """
+    taxas = []
+    for serie, padrao in (("tlp", TLP_PADRAO), ("ipca", IPCA_PADRAO)):
+        CACHE_CONSULTAS.inc(cache="taxas")
+        try:
+            taxas.append(_obter_taxa(serie))
+        except RuntimeError:
+            BCB_FALLBACKS.inc(serie=serie)
+            taxas.append(padrao)
+    return tuple(taxas)
+
+
+@st.cache_data(ttl=86400, max_entries=256, show_spinner=False)
+def _simular(valor_liberado, carencia, prazo_amortizacao, taxa_bndes_fixo, tlp, ipca, data_contratacao):
+    """
+    Executa a simulação e resume o fluxo de pagamentos.
+    """
+    CACHE_FALHAS.inc(cache="simulacao")
+    simulador = SimuladorBNDES(
+        valor_liberado=valor_liberado,
+        carencia=carencia,
+        periodic_juros=3,
+        prazo_amortizacao=prazo_amortizacao,
+        periodic_amortizacao=1,
+        juros_prefixados_aa=tlp,
+        ipca_mensal=ipca,
+        spread_bndes_aa=taxa_bndes_fixo,
+        spread_banco_aa=5.75,
+        data_contratacao=datetime.combine(data_contratacao, datetime.min.time()),
+    )
+
+    resultados_df, configuracoes = simulador.exibir_dados_pagamento()
+    # Atualizar o valor da chave
+    configuracoes["Periodicidade de Juros (meses)"] = "Trimestral"
+    configuracoes["Periodicidade de Amortização (meses)"] = "Mensal"
+
+    return resultados_df, configuracoes, simulador.resumo_pagamentos()
+
+
+def simular(valor_liberado, carencia, prazo_amortizacao, taxa_bndes_fixo, tlp, ipca, data_contratacao):
+    """
+    Executa uma simulação e guarda o resultado em cache pelos parâmetros informados.
+    """
+    CACHE_CONSULTAS.inc(cache="simulacao")
+    return _simular(valor_liberado, carencia, prazo_amortizacao, taxa_bndes_fixo, tlp, ipca, data_contratacao)
+
+
+def cenarios_comparacao(carencia, prazo_amortizacao):
+    """
+    Monta os cenários da comparação: todos os produtos elegíveis para os termos
+    informados, mais variações de carência (±3 meses) e de amortização (±12 meses)
+    que respeitem as regras de cada produto.
+    """
+    cenarios = []
+    for nome, regra in regras.items():
+        if carencia > regra["carencia_max"] or carencia + prazo_amortizacao > regra["prazo_max"]:
+            continue
+
+        variacoes = [(carencia, prazo_amortizacao),
+                     (carencia - 3, prazo_amortizacao), (carencia + 3, prazo_amortizacao),
+                     (carencia, prazo_amortizacao - 12), (carencia, prazo_amortizacao + 12)]
+        for carencia_var, prazo_var in variacoes:
+            if not 3 <= carencia_var <= regra["carencia_max"] or prazo_var < 1:
+                continue
+            if carencia_var + prazo_var > regra["prazo_max"]:
+                continue
+            cenarios.append((nome, carencia_var, prazo_var))
+    return cenarios
+
+
+def comparar_produtos(valor_liberado, carencia, prazo_amortizacao):
+    """
+    Simula todos os cenários de comparação, com as taxas buscadas uma única vez.
+    Os resultados ficam no mesmo cache de `simular`.
+    """
+    tlp, ipca = obter_taxas()
+    hoje = date.today()
+
+    linhas = []
+    for nome, carencia_var, prazo_var in cenarios_comparacao(carencia, prazo_amortizacao):
+        _, _, resumo = simular(valor_liberado, carencia_var, prazo_var,
+                               regras[nome]["taxa_bndes_fixo"], tlp, ipca, hoje)
+        linhas.append({
+            "Produto": nome,
+            "Carência (meses)": carencia_var,
+            "Amortização (meses)": prazo_var,
+            "Total de Juros": format_currency(resumo["total_juros"], 'BRL', locale='pt_BR'),
+            "Maior Parcela": format_currency(resumo["maior_parcela"], 'BRL', locale='pt_BR'),
+            "CET (Anual)": f"{resumo['cet_aa']:.2f}%".replace('.', ',') if resumo["cet_aa"] is not None else "-",
+        })
+
+    return pd.DataFrame(linhas)
+
+
 st.set_page_config(
     page_title="Simulador BNDES",
     layout="wide"
 )
+iniciar_metricas()
 # Adicionando a logo do BNDES
 st.image("banco-bndes.svg", width= 250)
 # Título do app
 st.title("Simulador de Pagamentos BNDES")
-# Regras de prazo máximo e carência
-regras = {
-    "BK Aquisição e Comercialização (FINAME)": {"prazo_max": 120, "carencia_max": 24, "taxa_bndes_fixo": 0.95},
-    "BNDES Automático - Projeto de Investimento": {"prazo_max": 240, "carencia_max": 36, "taxa_bndes_fixo": 0.95},
-    "BNDES Finame - Baixo Carbono": {"prazo_max": 120, "carencia_max": 24, "taxa_bndes_fixo": 0.75},
-}
 
 
 # Entradas do usuário
@@ -95,53 +230,53 @@ if prazo_total > prazo_max:
     st.error(f"O prazo total não pode exceder {prazo_max} meses.")
     erro = True
 
-# Botão de simular só aparece se não houver erros
+# Botões de simular e comparar só aparecem se não houver erros
 if not erro:
-    if st.button("Simular"):
+    col_simular, col_comparar = st.columns(2)
+    with col_simular:
+        botao_simular = st.button("Simular")
+    with col_comparar:
+        botao_comparar = st.button("Comparar produtos")
+
+    if botao_comparar:
         try:
-            # Inicializa o simulador com os parâmetros fornecidos
-            simulador = SimuladorBNDES(
-
-                valor_liberado=valor_liberado,
-                carencia=carencia,
-                periodic_juros=3,
-                prazo_amortizacao=prazo_amortizacao,
-                periodic_amortizacao=1,
-                juros_prefixados_aa=0.0,
-                ipca_mensal=0.0,
-                spread_bndes_aa=taxa_bndes_fixo,
-                spread_banco_aa=5.75,
-            )
+            comparacao_df = comparar_produtos(valor_liberado, carencia, prazo_amortizacao)
+            st.write("### Comparação entre Produtos")
+            st.dataframe(comparacao_df, use_container_width=True, hide_index=True)
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao processar a comparação: {e}")
 
-            # Gera os resultados da simulação
-            resultados_df, configuracoes = simulador.exibir_dados_pagamento()
-            # Atualizar o valor da chave
-            configuracoes["Periodicidade de Juros (meses)"] = "Trimestral"
-            configuracoes["Periodicidade de Amortização (meses)"] = "Mensal"
+    if botao_simular:
+        try:
+            # Gera os resultados da simulação (compartilhados com a comparação via cache)
+            tlp, ipca = obter_taxas()
+            resultados_df, configuracoes, _ = simular(valor_liberado, carencia, prazo_amortizacao,
+                                                      taxa_bndes_fixo, tlp, ipca, date.today())
 
 
             # Geração do PDF
-            pdf = PDF()
-            pdf.add_page()
+            with PDF_LATENCIA.medir():
+                pdf = PDF()
+                pdf.add_page()
 
-            # Configurações como texto
-            pdf.set_font("Arial", size=8)
-            pdf.cell(0, 8, f"Simulação do Produto: {produto}", ln=True)
-            for key, value in configuracoes.items():
-                pdf.cell(0, 8, f"{key}: {value}", ln=True)
+                # Configurações como texto
+                pdf.set_font("Arial", size=8)
+                pdf.cell(0, 8, f"Simulação do Produto: {produto}", ln=True)
+                for key, value in configuracoes.items():
+                    pdf.cell(0, 8, f"{key}: {value}", ln=True)
 
-            pdf.ln(8)  # Linha em branco para separação
+                pdf.ln(8)  # Linha em branco para separação
 
-            # Resultados como tabela
-            headers = list(resultados_df.columns)
-            data = resultados_df.values.tolist()
-            column_widths = [15 if i < 2 else 28 for i in range(len(headers))]
+                # Resultados como tabela
+                headers = list(resultados_df.columns)
+                data = resultados_df.values.tolist()
+                column_widths = [15 if i < 2 else 28 for i in range(len(headers))]
 
-            # Adiciona a tabela ao PDF com as larguras personalizadas
-            pdf.add_table(data=data, column_widths=column_widths, headers=headers)
+                # Adiciona a tabela ao PDF com as larguras personalizadas
+                pdf.add_table(data=data, column_widths=column_widths, headers=headers)
 
-            # Salva o PDF em memória
-            pdf_output = pdf.output(dest="S").encode("latin1")
+                # Salva o PDF em memória
+                pdf_output = pdf.output(dest="S").encode("latin1")
 
             # Botão de download do PDF
             st.download_button(
@@ -0,0 +1,215 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+from dateutil.relativedelta import relativedelta
+
+from Simulador import SimuladorBNDES, FERIADOS
+
+# Séries do SGS/BCB usadas pelo simulador (mesmas de obter_tlp / obter_ipca)
+SERIES = {
+    "tlp": 27572,
+    "ipca": 433,
+}
+DIRETORIO_SERIES = "dados"
+
+# Atraso entre a data de referência de cada observação e sua divulgação. O IPCA do
+# mês M (datado de 01/M no SGS) só é divulgado pelo IBGE por volta do dia 10 de M+1;
+# o dia 15 é usado como margem conservadora. A TLP de cada mês é divulgada antes
+# do início do mês e vale a partir da própria data de referência.
+DEFASAGEM_DIVULGACAO = {
+    "ipca": relativedelta(months=1, day=15),
+}
+
+# Primeiro dia coberto por lista_feriados; antes dele, os feriados seriam ignorados
+INICIO_FERIADOS = datetime.combine(min(FERIADOS), datetime.min.time())
+
+
+def caminho_serie(nome, diretorio=DIRETORIO_SERIES):
+    return os.path.join(diretorio, f"{nome}.json")
+
+
+def atualizar_series(data_inicial, data_final=None, diretorio=DIRETORIO_SERIES):
+    """
+    Baixa o histórico da TLP e do IPCA da API do Banco Central e salva localmente,
+    no mesmo formato JSON retornado pelo SGS ([{"data": "dd/mm/aaaa", "valor": "x"}]).
+
+    Parâmetros:
+    - data_inicial (datetime): Início do histórico.
+    - data_final (datetime, opcional): Fim do histórico (padrão: hoje).
+    - diretorio (str): Diretório onde as séries são gravadas.
+    """
+    data_final = data_final or datetime.today()
+    os.makedirs(diretorio, exist_ok=True)
+
+    for nome, codigo in SERIES.items():
+        url = (f"https://api.bcb.gov.br/dados/serie/bcdata.sgs.{codigo}/dados?formato=json"
+               f"&dataInicial={data_inicial:%d/%m/%Y}&dataFinal={data_final:%d/%m/%Y}")
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+        with open(caminho_serie(nome, diretorio), "w", encoding="utf-8") as arquivo:
+            arquivo.write(response.text)
+
+
+def carregar_serie(nome, diretorio=DIRETORIO_SERIES):
+    """
+    Carrega uma série armazenada localmente, datando cada observação pelo dia em
+    que passou a ser conhecida (ver `DEFASAGEM_DIVULGACAO`).
+
+    Retorna:
+    - tuple: (lista de datas de divulgação ordenadas, lista de valores correspondentes).
+    """
+    with open(caminho_serie(nome, diretorio), encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+
+    defasagem = DEFASAGEM_DIVULGACAO.get(nome, relativedelta())
+    pontos = sorted((datetime.strptime(d["data"], "%d/%m/%Y") + defasagem, float(d["valor"])) for d in dados)
+    return [data for data, _ in pontos], [valor for _, valor in pontos]
+
+
+def valor_na_data(serie, data):
+    """
+    Retorna o valor vigente da série na data informada, isto é, a última
+    observação já divulgada até `data` (inclusive).
+
+    Parâmetros:
+    - serie (tuple): Série retornada por `carregar_serie`.
+    - data (datetime): Data de contratação.
+
+    Retorna:
+    - float: Valor da série vigente na data.
+    """
+    datas, valores = serie
+    posicao = bisect_right(datas, data)
+    if posicao == 0:
+        raise ValueError(f"Série sem observações até {data:%d/%m/%Y}.")
+    return valores[posicao - 1]
+
+
+def dias_uteis(data_inicial, data_final):
+    """
+    Gera os dias úteis entre as datas (inclusive), desconsiderando fins de
+    semana e os feriados de `lista_feriados`.
+    """
+    data_atual = data_inicial
+    while data_atual <= data_final:
+        if data_atual.weekday() < 5 and data_atual.date() not in FERIADOS:
+            yield data_atual
+        data_atual += timedelta(days=1)
+
+
+def _simular_na_data(argumentos):
+    """
+    Executa uma simulação completa para uma data de contratação.
+    Função de módulo para poder ser enviada aos processos do pool.
+    """
+    data_contratacao, tlp, ipca, termos = argumentos
+    simulador = SimuladorBNDES(
+        juros_prefixados_aa=tlp,
+        ipca_mensal=ipca,
+        data_contratacao=data_contratacao,
+        **termos,
+    )
+    simulador.exibir_dados_pagamento()
+    resumo = simulador.resumo_pagamentos()
+
+    return {
+        "Data de Contratação": data_contratacao.strftime("%d/%m/%Y"),
+        "TLP (Anual)": tlp,
+        "IPCA Mensal": ipca,
+        "Total Pago": resumo["total_pago"],
+        "Maior Parcela": resumo["maior_parcela"],
+        "CET (Anual)": resumo["cet_aa"],
+    }
+
+
+def backtest(valor_liberado, carencia, prazo_amortizacao, data_inicial, data_final,
+             periodic_juros=3, periodic_amortizacao=1, spread_bndes_aa=0.95, spread_banco_aa=5.75,
+             diretorio=DIRETORIO_SERIES, max_workers=None):
+    """
+    Simula o mesmo contrato originado em cada dia útil do intervalo, usando a TLP
+    e o IPCA vigentes em cada data de contratação (séries locais, ver
+    `atualizar_series`). As simulações rodam em paralelo e as linhas de resumo
+    são produzidas em ordem cronológica, à medida que ficam prontas.
+
+    Datas anteriores ao primeiro ano de `lista_feriados` são descartadas (com aviso),
+    pois nelas dias úteis e vencimentos seriam calculados sem feriados. Se nenhuma
+    data restar, lança ValueError.
+
+    Retorna:
+    - generator: Um dicionário por data de contratação com TLP, IPCA, total pago,
+      maior parcela e CET anual.
+    """
+    if data_inicial < INICIO_FERIADOS:
+        print(f"Aviso: lista_feriados começa em {INICIO_FERIADOS:%d/%m/%Y}; "
+              f"datas anteriores foram descartadas do backtest.", file=sys.stderr)
+        data_inicial = INICIO_FERIADOS
+    if data_inicial > data_final:
+        raise ValueError(f"Intervalo sem datas de contratação a partir de {data_inicial:%d/%m/%Y}.")
+
+    serie_tlp = carregar_serie("tlp", diretorio)
+    serie_ipca = carregar_serie("ipca", diretorio)
+    termos = {
+        "valor_liberado": valor_liberado,
+        "carencia": carencia,
+        "periodic_juros": periodic_juros,
+        "prazo_amortizacao": prazo_amortizacao,
+        "periodic_amortizacao": periodic_amortizacao,
+        "spread_bndes_aa": spread_bndes_aa,
+        "spread_banco_aa": spread_banco_aa,
+    }
+
+    tarefas = (
+        (data, valor_na_data(serie_tlp, data), valor_na_data(serie_ipca, data), termos)
+        for data in dias_uteis(data_inicial, data_final)
+    )
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(_simular_na_data, tarefas, chunksize=16)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest de contratações BNDES sobre o histórico do BCB.")
+    parser.add_argument("--valor", type=float, required=True, help="Valor do financiamento")
+    parser.add_argument("--carencia", type=int, required=True, help="Carência (meses)")
+    parser.add_argument("--prazo", type=int, required=True, help="Amortização (meses)")
+    parser.add_argument("--anos", type=int, default=2, help="Anos de histórico até hoje (padrão: 2)")
+    parser.add_argument("--inicio", help="Data inicial dd/mm/aaaa (substitui --anos)")
+    parser.add_argument("--fim", help="Data final dd/mm/aaaa (padrão: hoje)")
+    parser.add_argument("--spread-bndes", type=float, default=0.95, help="Spread BNDES anual (%%)")
+    parser.add_argument("--spread-banco", type=float, default=5.75, help="Spread banco anual (%%)")
+    parser.add_argument("--diretorio", default=DIRETORIO_SERIES, help="Diretório das séries locais")
+    parser.add_argument("--atualizar", action="store_true", help="Baixa as séries do BCB antes de rodar")
+    args = parser.parse_args()
+
+    hoje = datetime.combine(datetime.today().date(), datetime.min.time())
+    data_final = datetime.strptime(args.fim, "%d/%m/%Y") if args.fim else hoje
+    data_inicial = (datetime.strptime(args.inicio, "%d/%m/%Y") if args.inicio
+                    else data_final - relativedelta(years=args.anos))
+
+    if args.atualizar:
+        # Margem de um ano para que a primeira data já tenha valor vigente
+        atualizar_series(data_inicial - relativedelta(years=1), data_final, args.diretorio)
+
+    escritor = None
+    try:
+        for linha in backtest(args.valor, args.carencia, args.prazo, data_inicial, data_final,
+                              spread_bndes_aa=args.spread_bndes, spread_banco_aa=args.spread_banco,
+                              diretorio=args.diretorio):
+            if escritor is None:
+                escritor = csv.DictWriter(sys.stdout, fieldnames=list(linha), delimiter=";")
+                escritor.writeheader()
+            escritor.writerow(linha)
+            sys.stdout.flush()
+    except ValueError as e:
+        parser.exit(1, f"Erro: {e}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites padrão dos histogramas de latência, em segundos
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _formatar_rotulos(rotulos):
+    if not rotulos:
+        return ""
+    pares = ",".join(f'{nome}="{valor}"' for nome, valor in rotulos)
+    return "{" + pares + "}"
+
+
+def _formatar_numero(valor):
+    return "+Inf" if valor == float("inf") else repr(float(valor))
+
+
+class Contador:
+    """
+    Contador monotônico, com uma série por combinação de rótulos.
+    """
+    tipo = "counter"
+
+    def __init__(self, nome, descricao):
+        self.nome = nome
+        self.descricao = descricao
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def inc(self, valor=1, **rotulos):
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def valor(self, **rotulos):
+        return self._valores.get(tuple(sorted(rotulos.items())), 0)
+
+    def prometheus(self):
+        with self._lock:
+            itens = list(self._valores.items())
+        return [f"{self.nome}{_formatar_rotulos(chave)} {_formatar_numero(valor)}" for chave, valor in itens]
+
+    def como_dict(self):
+        with self._lock:
+            itens = list(self._valores.items())
+        return [{"rotulos": dict(chave), "valor": valor} for chave, valor in itens]
+
+
+class _Cronometro:
+    """
+    Mede o tempo de um bloco (ou função decorada) e registra no histograma.
+    """
+
+    def __init__(self, histograma, rotulos):
+        self.histograma = histograma
+        self.rotulos = rotulos
+
+    def __call__(self, funcao):
+        # Um cronômetro novo por chamada, para permitir chamadas concorrentes
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with _Cronometro(self.histograma, self.rotulos):
+                return funcao(*args, **kwargs)
+        return envolvida
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histograma.observar(time.perf_counter() - self.inicio, **self.rotulos)
+        return False
+
+
+class Histograma:
+    """
+    Histograma de latências com buckets fixos, soma e contagem por combinação de rótulos.
+    """
+    tipo = "histogram"
+
+    def __init__(self, nome, descricao, buckets=BUCKETS_PADRAO):
+        self.nome = nome
+        self.descricao = descricao
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, **rotulos):
+        chave = tuple(sorted(rotulos.items()))
+        posicao = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                # [contagens por bucket (+Inf na última posição), soma, contagem]
+                serie = self._series[chave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][posicao] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def medir(self, **rotulos):
+        return _Cronometro(self, rotulos)
+
+    def _copiar_series(self):
+        with self._lock:
+            return [(chave, list(contagens), soma, total) for chave, (contagens, soma, total) in self._series.items()]
+
+    def _acumulados(self, contagens):
+        acumulado = 0
+        for limite, contagem in zip(self.buckets + (float("inf"),), contagens):
+            acumulado += contagem
+            yield limite, acumulado
+
+    def prometheus(self):
+        linhas = []
+        for chave, contagens, soma, total in self._copiar_series():
+            for limite, acumulado in self._acumulados(contagens):
+                rotulos = _formatar_rotulos(chave + (("le", _formatar_numero(limite)),))
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_formatar_rotulos(chave)} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{_formatar_rotulos(chave)} {total}")
+        return linhas
+
+    def como_dict(self):
+        return [
+            {
+                "rotulos": dict(chave),
+                "contagem": total,
+                "soma": soma,
+                "media": soma / total if total else 0.0,
+                "buckets": {_formatar_numero(limite): acumulado
+                            for limite, acumulado in self._acumulados(contagens)},
+            }
+            for chave, contagens, soma, total in self._copiar_series()
+        ]
+
+
+class RegistroMetricas:
+    """
+    Registro das métricas do processo, exportáveis em formato texto do Prometheus ou JSON.
+    """
+
+    def __init__(self):
+        self._metricas = {}
+
+    def contador(self, nome, descricao):
+        return self._metricas.setdefault(nome, Contador(nome, descricao))
+
+    def histograma(self, nome, descricao, buckets=BUCKETS_PADRAO):
+        return self._metricas.setdefault(nome, Histograma(nome, descricao, buckets))
+
+    def prometheus(self):
+        linhas = []
+        for metrica in self._metricas.values():
+            linhas.append(f"# HELP {metrica.nome} {metrica.descricao}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.prometheus())
+        return "\n".join(linhas) + "\n"
+
+    def como_dict(self):
+        dados = {
+            metrica.nome: {"tipo": metrica.tipo, "descricao": metrica.descricao, "series": metrica.como_dict()}
+            for metrica in self._metricas.values()
+        }
+        dados["razao_acerto_cache"] = razao_acerto_cache()
+        return dados
+
+    def json(self):
+        return json.dumps(self.como_dict(), ensure_ascii=False)
+
+
+registro = RegistroMetricas()
+
+BCB_REQUISICOES = registro.contador(
+    "simulador_bcb_requisicoes_total", "Consultas à API do BCB por série e resultado (sucesso/falha).")
+BCB_FALLBACKS = registro.contador(
+    "simulador_bcb_fallbacks_total", "Vezes em que o valor padrão da série foi usado no lugar da API do BCB.")
+BCB_LATENCIA = registro.histograma(
+    "simulador_bcb_requisicao_segundos", "Latência das consultas à API do BCB.")
+SIMULACAO_LATENCIA = registro.histograma(
+    "simulador_simulacao_segundos", "Latência de exibir_dados_pagamento.")
+PDF_LATENCIA = registro.histograma(
+    "simulador_pdf_segundos", "Latência da geração do PDF da simulação.")
+# Consultas são contadas nos wrappers sem cache do app; falhas, no corpo das funções
+# decoradas com st.cache_data, que só executa quando o resultado não está no cache.
+CACHE_CONSULTAS = registro.contador(
+    "simulador_cache_consultas_total", "Consultas aos caches do app.")
+CACHE_FALHAS = registro.contador(
+    "simulador_cache_falhas_total", "Consultas aos caches do app que exigiram novo cálculo.")
+
+
+def razao_acerto_cache():
+    """
+    Retorna a razão de acertos de cada cache: (consultas - falhas) / consultas.
+    """
+    razoes = {}
+    for item in CACHE_CONSULTAS.como_dict():
+        cache = item["rotulos"].get("cache")
+        consultas = item["valor"]
+        falhas = CACHE_FALHAS.valor(cache=cache)
+        razoes[cache] = max(consultas - falhas, 0) / consultas if consultas else 0.0
+    return razoes
+
+
+class _ManipuladorMetricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            corpo = registro.prometheus().encode("utf-8")
+            tipo = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            corpo = registro.json().encode("utf-8")
+            tipo = "application/json; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass  # Evita poluir a saída com cada coleta
+
+
+def iniciar_servidor(porta, endereco="127.0.0.1"):
+    """
+    Expõe as métricas em /metrics (Prometheus) e /metrics.json numa thread em segundo plano.
+    Por padrão aceita apenas conexões locais; o servidor não tem autenticação.
+
+    Retorna:
+    - ThreadingHTTPServer: O servidor iniciado.
+    """
+    servidor = ThreadingHTTPServer((endereco, porta), _ManipuladorMetricas)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
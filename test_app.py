@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+# O app é um script Streamlit: importá-lo executa a página em modo bare, sem abrir o servidor de métricas
+os.environ["SIMULADOR_METRICAS_PORTA"] = "0"
+import app
+from Simulador import SimuladorBNDES, TLP_PADRAO, IPCA_PADRAO
+
+FINAME = "BK Aquisição e Comercialização (FINAME)"
+AUTOMATICO = "BNDES Automático - Projeto de Investimento"
+BAIXO_CARBONO = "BNDES Finame - Baixo Carbono"
+
+
+def test_cenarios_variacoes_dentro_dos_limites():
+    cenarios = app.cenarios_comparacao(6, 24)
+
+    assert [c for c in cenarios if c[0] == FINAME] == [
+        (FINAME, 6, 24), (FINAME, 3, 24), (FINAME, 9, 24), (FINAME, 6, 12), (FINAME, 6, 36),
+    ]
+
+
+def test_cenarios_descartam_carencia_abaixo_de_3():
+    cenarios = app.cenarios_comparacao(3, 24)
+
+    assert all(carencia >= 3 for _, carencia, _ in cenarios)
+    assert (FINAME, 6, 24) in cenarios
+
+
+def test_cenarios_descartam_carencia_acima_do_maximo():
+    cenarios = app.cenarios_comparacao(24, 24)
+
+    assert (FINAME, 27, 24) not in cenarios
+    assert (AUTOMATICO, 27, 24) in cenarios
+
+
+def test_cenarios_descartam_prazo_total_acima_do_maximo():
+    cenarios = app.cenarios_comparacao(9, 108)
+
+    # 9 + 120 = 129 meses excede o prazo máximo de 120 do FINAME
+    assert [c for c in cenarios if c[0] == FINAME] == [
+        (FINAME, 9, 108), (FINAME, 6, 108), (FINAME, 12, 108), (FINAME, 9, 96),
+    ]
+    assert (AUTOMATICO, 9, 120) in cenarios
+
+
+def test_cenarios_pulam_produto_inelegivel():
+    cenarios = app.cenarios_comparacao(30, 120)
+
+    assert {nome for nome, _, _ in cenarios} == {AUTOMATICO}
+
+
+@pytest.fixture
+def cache_taxas_vazio():
+    app._obter_taxa.clear()
+    yield
+    app._obter_taxa.clear()
+
+
+def test_obter_taxas_usa_padrao_sem_guardar_falha(monkeypatch, cache_taxas_vazio):
+    chamadas = []
+
+    def falhar(usar_padrao=True):
+        chamadas.append(usar_padrao)
+        raise RuntimeError("API indisponível")
+
+    monkeypatch.setattr(SimuladorBNDES, "obter_tlp", staticmethod(falhar))
+    monkeypatch.setattr(SimuladorBNDES, "obter_ipca", staticmethod(falhar))
+
+    assert app.obter_taxas() == (TLP_PADRAO, IPCA_PADRAO)
+    assert app.obter_taxas() == (TLP_PADRAO, IPCA_PADRAO)
+    # A falha não fica no cache: a segunda consulta tenta a API de novo
+    assert chamadas == [False, False, False, False]
+
+
+def test_obter_taxas_guarda_sucesso_no_cache(monkeypatch, cache_taxas_vazio):
+    chamadas = []
+
+    def buscar(valor):
+        def obter(usar_padrao=True):
+            chamadas.append(valor)
+            return valor
+        return staticmethod(obter)
+
+    monkeypatch.setattr(SimuladorBNDES, "obter_tlp", buscar(6.1))
+    monkeypatch.setattr(SimuladorBNDES, "obter_ipca", buscar(0.3))
+
+    assert app.obter_taxas() == (6.1, 0.3)
+    assert app.obter_taxas() == (6.1, 0.3)
+    assert chamadas == [6.1, 0.3]
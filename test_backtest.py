@@ -0,0 +1,64 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from Simulador import SimuladorBNDES
+import backtest
+
+
+def gravar_serie(diretorio, nome, pontos):
+    dados = [{"data": data, "valor": str(valor)} for data, valor in pontos]
+    (diretorio / f"{nome}.json").write_text(json.dumps(dados), encoding="utf-8")
+
+
+def test_ipca_so_vale_apos_divulgacao(tmp_path):
+    gravar_serie(tmp_path, "ipca", [("01/01/2024", 0.42), ("01/02/2024", 0.83), ("01/03/2024", 0.16)])
+    serie = backtest.carregar_serie("ipca", str(tmp_path))
+
+    assert backtest.valor_na_data(serie, datetime(2024, 3, 1)) == 0.42
+    assert backtest.valor_na_data(serie, datetime(2024, 3, 15)) == 0.83
+    assert backtest.valor_na_data(serie, datetime(2024, 4, 15)) == 0.16
+
+
+def test_tlp_vale_desde_a_data_de_referencia(tmp_path):
+    gravar_serie(tmp_path, "tlp", [("01/02/2024", 6.0), ("01/03/2024", 6.2)])
+    serie = backtest.carregar_serie("tlp", str(tmp_path))
+
+    assert backtest.valor_na_data(serie, datetime(2024, 3, 1)) == 6.2
+
+
+def test_ipca_zero_nao_consulta_api(tmp_path, monkeypatch):
+    def falhar():
+        raise AssertionError("não deveria consultar a API")
+
+    monkeypatch.setattr(SimuladorBNDES, "obter_tlp", staticmethod(falhar))
+    monkeypatch.setattr(SimuladorBNDES, "obter_ipca", staticmethod(falhar))
+    gravar_serie(tmp_path, "tlp", [("01/05/2024", 6.0)])
+    gravar_serie(tmp_path, "ipca", [("01/04/2024", 0.0)])
+
+    linhas = list(backtest.backtest(100_000.0, 3, 12, datetime(2024, 6, 3), datetime(2024, 6, 4),
+                                    diretorio=str(tmp_path), max_workers=1))
+
+    assert [linha["Data de Contratação"] for linha in linhas] == ["03/06/2024", "04/06/2024"]
+    assert all(linha["IPCA Mensal"] == 0.0 for linha in linhas)
+
+
+def test_datas_sem_feriados_sao_descartadas(tmp_path, capsys):
+    gravar_serie(tmp_path, "tlp", [("01/01/2023", 6.0)])
+    gravar_serie(tmp_path, "ipca", [("01/10/2023", 0.3)])
+
+    linhas = list(backtest.backtest(100_000.0, 3, 12, datetime(2023, 12, 28), datetime(2024, 1, 2),
+                                    diretorio=str(tmp_path), max_workers=1))
+
+    assert [linha["Data de Contratação"] for linha in linhas] == ["02/01/2024"]
+    assert "lista_feriados" in capsys.readouterr().err
+
+
+def test_intervalo_todo_antes_dos_feriados(tmp_path):
+    gravar_serie(tmp_path, "tlp", [("01/01/2021", 6.0)])
+    gravar_serie(tmp_path, "ipca", [("01/01/2021", 0.3)])
+
+    with pytest.raises(ValueError):
+        list(backtest.backtest(100_000.0, 3, 12, datetime(2021, 1, 1), datetime(2021, 6, 1),
+                               diretorio=str(tmp_path), max_workers=1))
@@ -0,0 +1,89 @@
+import urllib.request
+
+import pytest
+
+import metricas
+import Simulador
+from metricas import BCB_FALLBACKS, BCB_REQUISICOES, Contador, Histograma
+from Simulador import SimuladorBNDES, TLP_PADRAO
+
+
+def test_histograma_buckets_acumulados_soma_e_contagem():
+    histograma = Histograma("teste_segundos", "Teste.", buckets=(0.1, 0.5, 1.0))
+    for valor in (0.05, 0.1, 0.7, 3.0):
+        histograma.observar(valor, serie="x")
+
+    assert histograma.prometheus() == [
+        'teste_segundos_bucket{serie="x",le="0.1"} 2',
+        'teste_segundos_bucket{serie="x",le="0.5"} 2',
+        'teste_segundos_bucket{serie="x",le="1.0"} 3',
+        'teste_segundos_bucket{serie="x",le="+Inf"} 4',
+        'teste_segundos_sum{serie="x"} 3.85',
+        'teste_segundos_count{serie="x"} 4',
+    ]
+
+
+def test_contador_por_rotulos():
+    contador = Contador("teste_total", "Teste.")
+    contador.inc(serie="a")
+    contador.inc(2, serie="a")
+    contador.inc(serie="b")
+
+    assert contador.valor(serie="a") == 3
+    assert contador.valor(serie="c") == 0
+    assert contador.prometheus() == ['teste_total{serie="a"} 3.0', 'teste_total{serie="b"} 1.0']
+
+
+def test_razao_acerto_cache(monkeypatch):
+    consultas = Contador("consultas_total", "Teste.")
+    falhas = Contador("falhas_total", "Teste.")
+    monkeypatch.setattr(metricas, "CACHE_CONSULTAS", consultas)
+    monkeypatch.setattr(metricas, "CACHE_FALHAS", falhas)
+
+    assert metricas.razao_acerto_cache() == {}
+
+    consultas.inc(4, cache="simulacao")
+    falhas.inc(1, cache="simulacao")
+    consultas.inc(0, cache="taxas")
+
+    assert metricas.razao_acerto_cache() == {"simulacao": 0.75, "taxas": 0.0}
+
+
+@pytest.fixture
+def api_indisponivel(monkeypatch):
+    def falhar(*args, **kwargs):
+        raise ConnectionError("API indisponível")
+
+    monkeypatch.setattr(Simulador.requests, "get", falhar)
+
+
+def test_obter_tlp_conta_falha_e_fallback(api_indisponivel):
+    falhas = BCB_REQUISICOES.valor(serie="tlp", resultado="falha")
+    fallbacks = BCB_FALLBACKS.valor(serie="tlp")
+
+    assert SimuladorBNDES.obter_tlp() == TLP_PADRAO
+    assert BCB_REQUISICOES.valor(serie="tlp", resultado="falha") == falhas + 1
+    assert BCB_FALLBACKS.valor(serie="tlp") == fallbacks + 1
+
+
+def test_obter_tlp_sem_padrao_nao_conta_fallback(api_indisponivel):
+    falhas = BCB_REQUISICOES.valor(serie="tlp", resultado="falha")
+    fallbacks = BCB_FALLBACKS.valor(serie="tlp")
+
+    with pytest.raises(RuntimeError):
+        SimuladorBNDES.obter_tlp(usar_padrao=False)
+    assert BCB_REQUISICOES.valor(serie="tlp", resultado="falha") == falhas + 1
+    assert BCB_FALLBACKS.valor(serie="tlp") == fallbacks
+
+
+def test_servidor_expoe_metrics():
+    servidor = metricas.iniciar_servidor(0)
+    try:
+        porta = servidor.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{porta}/metrics") as resposta:
+            corpo = resposta.read().decode("utf-8")
+            assert resposta.headers["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+        assert "# TYPE simulador_bcb_requisicoes_total counter" in corpo
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
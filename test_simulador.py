@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from Simulador import SimuladorBNDES
+
+
+def criar_simulador(**parametros):
+    termos = dict(valor_liberado=100_000.0, carencia=3, periodic_juros=3, prazo_amortizacao=12,
+                  periodic_amortizacao=1, juros_prefixados_aa=6.0, ipca_mensal=0.4,
+                  spread_bndes_aa=0.95, spread_banco_aa=5.75, data_contratacao=datetime(2024, 6, 3))
+    termos.update(parametros)
+    return SimuladorBNDES(**termos)
+
+
+def test_taxas_informadas_zero_nao_buscam_api(monkeypatch):
+    def falhar():
+        raise AssertionError("não deveria consultar a API")
+
+    monkeypatch.setattr(SimuladorBNDES, "obter_tlp", staticmethod(falhar))
+    monkeypatch.setattr(SimuladorBNDES, "obter_ipca", staticmethod(falhar))
+
+    simulador = criar_simulador(juros_prefixados_aa=0.0, ipca_mensal=0.0)
+
+    assert simulador.juros_prefixados_aa == 0.0
+    assert simulador.ipca_mensal == 0.0
+
+
+def test_cet_pagamento_unico_apos_um_ano():
+    simulador = criar_simulador()
+    simulador.fluxo_pagamentos = [(simulador.data_contratacao + timedelta(days=365), 110_000.0)]
+
+    assert simulador.calcular_cet() == 10.0
+
+
+def test_cet_fora_do_intervalo_de_busca():
+    simulador = criar_simulador()
+    simulador.fluxo_pagamentos = [(simulador.data_contratacao + timedelta(days=365), 100_000_000.0)]
+
+    with pytest.raises(ValueError):
+        simulador.calcular_cet()
+
+
+def test_resumo_pagamentos():
+    simulador = criar_simulador()
+    simulador.fluxo_pagamentos = [
+        (datetime(2024, 9, 16), 3_000.0),
+        (datetime(2024, 10, 15), 12_000.0),
+        (datetime(2025, 6, 16), 95_000.0),
+    ]
+
+    resumo = simulador.resumo_pagamentos()
+
+    assert resumo["total_pago"] == 110_000.0
+    assert resumo["total_juros"] == 10_000.0
+    assert resumo["maior_parcela"] == 95_000.0
+
+
+def test_fluxo_da_simulacao_amortiza_o_valor_liberado():
+    simulador = criar_simulador()
+    simulador.exibir_dados_pagamento()
+    resumo = simulador.resumo_pagamentos()
+
+    # Carência trimestral: 1 pagamento de juros + 12 parcelas mensais
+    assert len(simulador.fluxo_pagamentos) == 13
+    assert resumo["total_juros"] > 0
+    assert 0 < resumo["cet_aa"] < 30
+
+
+def test_resumo_com_cet_fora_do_intervalo():
+    simulador = criar_simulador()
+    simulador.fluxo_pagamentos = [(simulador.data_contratacao + timedelta(days=365), 100_000_000.0)]
+
+    assert simulador.resumo_pagamentos()["cet_aa"] is None